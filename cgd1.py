@@ -19,24 +19,50 @@ Debug:
 from __future__ import annotations
 
 import argparse
-import asyncio
-import json
+import functools
 import logging
+import mmap
 import os
 import re
 import sys
-import traceback
+import time
 import wave
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime, time as dtime
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson  # optional: much faster JSON parse/serialize
+except ImportError:
+    orjson = None
+
 
 # -------------------------- defaults / config --------------------------
 
 DEFAULT_CONFIG_PATH = "~/.config/qingping-cgd1/config.json"
 
+# Precompiled patterns (skips re's internal cache lookup on every call)
+_HHMM_RE = re.compile(r"(\d{1,2}):(\d{2})")
+_TZ_HHMM_RE = re.compile(r"([+-])(\d{1,2}):(\d{2})")
+_EPOCH_RE = re.compile(r"\d{9,12}")
+_HEX8_RE = re.compile(r"[0-9a-f]{8}")
+
+# Local timezone resolved once per process. Fixed-offset snapshot of "now":
+# only valid for the current instant, so explicit epoch/date inputs must use
+# astimezone() to get the DST-correct offset for *their* timestamp.
+_LOCAL_TZ = datetime.now().astimezone().tzinfo
+
+# Deletion tables: drop everything that is not a hex digit (C-level pass,
+# much cheaper than re.sub on short strings)
+_NONHEX_DEL_TBL = str.maketrans(
+    "", "", "".join(chr(i) for i in range(256) if chr(i) not in "0123456789abcdefABCDEF")
+)
+_NONHEX_LOWER_DEL_TBL = str.maketrans(
+    "", "", "".join(chr(i) for i in range(256) if chr(i) not in "0123456789abcdef")
+)
+
 
 @dataclass(frozen=True)
 class StoredConfig:
@@ -45,21 +71,30 @@ class StoredConfig:
 
 
 def _expand_config_path(path_str: str | None) -> Path:
+    # No .resolve(): the OS resolves symlinks on open anyway, and resolve()
+    # stats every path component just to canonicalize a display string.
     raw = path_str or DEFAULT_CONFIG_PATH
-    return Path(raw).expanduser().resolve()
+    return Path(raw).expanduser()
 
 
 def _normalize_token_hex(token_str: str) -> str:
-    cleaned = re.sub(r"[^0-9a-fA-F]", "", token_str or "")
+    cleaned = (token_str or "").translate(_NONHEX_DEL_TBL)
     if len(cleaned) != 32:
         raise ValueError("token must be 16 bytes = 32 hex chars (separators allowed)")
     return cleaned.lower()
 
 
-def _read_config(path: Path) -> StoredConfig | None:
-    if not path.exists():
-        return None
-    data = json.loads(path.read_text(encoding="utf-8"))
+@functools.lru_cache(maxsize=4)
+def _read_config_cached(path_str: str, mtime_ns: int, size: int) -> StoredConfig | None:
+    # mtime_ns/size are only part of the cache key: a changed file gets a new
+    # key and the stale entry simply ages out of the LRU.
+    raw = Path(path_str).read_bytes()
+    if orjson is not None:
+        data = orjson.loads(raw)
+    else:
+        import json
+
+        data = json.loads(raw)
     address = str(data.get("address", "")).strip()
     token_hex = str(data.get("token", "")).strip()
     if not address or not token_hex:
@@ -67,18 +102,32 @@ def _read_config(path: Path) -> StoredConfig | None:
     return StoredConfig(address=address, token_hex=_normalize_token_hex(token_hex))
 
 
+def _read_config(path: Path) -> StoredConfig | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return _read_config_cached(str(path), st.st_mtime_ns, st.st_size)
+
+
 def _write_config(path: Path, cfg: StoredConfig) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(
-        json.dumps({"address": cfg.address, "token": cfg.token_hex}, indent=2) + "\n",
-        encoding="utf-8",
-    )
-    tmp.replace(path)
-    try:
-        os.chmod(path, 0o600)
-    except Exception:
-        pass
+    payload = {"address": cfg.address, "token": cfg.token_hex}
+    if orjson is not None:
+        blob = orjson.dumps(payload, option=orjson.OPT_INDENT_2) + b"\n"
+    else:
+        import json
+
+        blob = (json.dumps(payload, indent=2) + "\n").encode("utf-8")
+
+    # Create the temp file 0o600 from the start: no post-rename chmod, and no
+    # window where the token is world-readable.
+    fd = os.open(str(tmp), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(blob)
+    os.replace(tmp, path)
+    _read_config_cached.cache_clear()
 
 
 def _resolve_creds(args, config_path: Path) -> StoredConfig:
@@ -139,26 +188,36 @@ def _setup_logging(debug: bool) -> Reporter:
 
 # -------------------------- import library (folder: qingping/) --------------------------
 
+class _LazyLib(dict):
+    """dict that imports a qingping attribute on first access only."""
+
+    def __init__(self, loaders):
+        super().__init__()
+        self._loaders = loaders
+
+    def __missing__(self, key):
+        value = self[key] = self._loaders[key]()
+        return value
+
+
+@functools.cache
 def _import_lib() -> dict[str, Any]:
     """
-    Imports from ./qingping/*.py.
+    Lazy accessors into ./qingping/*.py — nothing (notably bleak, which is
+    heavy to import) is loaded until an action first touches a key.
     The script may be launched from any directory, so we ensure repo root is on sys.path.
     """
     root = Path(__file__).resolve().parent
     if str(root) not in sys.path:
         sys.path.insert(0, str(root))
 
-    from qingping.qingping import Qingping
-    from qingping.configuration import Language
-    from qingping.alarm import AlarmDay
-    import qingping.ringtones as ringtones
-
-    return {
-        "Qingping": Qingping,
-        "Language": Language,
-        "AlarmDay": AlarmDay,
-        "ringtones": ringtones,
-    }
+    return _LazyLib({
+        "Qingping": lambda: __import__("qingping.qingping", fromlist=["Qingping"]).Qingping,
+        "Configuration": lambda: __import__("qingping.configuration", fromlist=["Configuration"]).Configuration,
+        "Language": lambda: __import__("qingping.configuration", fromlist=["Language"]).Language,
+        "AlarmDay": lambda: __import__("qingping.alarm", fromlist=["AlarmDay"]).AlarmDay,
+        "ringtones": lambda: __import__("qingping.ringtones", fromlist=["ringtones"]),
+    })
 
 
 # -------------------------- helpers --------------------------
@@ -169,7 +228,7 @@ def _err_reason(e: Exception) -> str:
 
 
 def _parse_hhmm(value: str) -> dtime:
-    m = re.fullmatch(r"(\d{1,2}):(\d{2})", value.strip())
+    m = _HHMM_RE.fullmatch(value.strip())
     if not m:
         raise ValueError('time must be "HH:MM" (e.g. 07:30)')
     hh = int(m.group(1))
@@ -197,7 +256,7 @@ def _parse_tz(v: str) -> int:
     """
     t = v.strip()
     if ":" in t:
-        m = re.fullmatch(r"([+-])(\d{1,2}):(\d{2})", t)
+        m = _TZ_HHMM_RE.fullmatch(t)
         if not m:
             raise ValueError('tz must be +HH:MM / -HH:MM or minutes (e.g. -60)')
         sign = 1 if m.group(1) == "+" else -1
@@ -214,6 +273,21 @@ def _parse_tz(v: str) -> int:
     return minutes
 
 
+def _fmt_hhmm(t: dtime) -> str:
+    # fixed-format "%H:%M" without strftime's format-string interpretation
+    return f"{t.hour:02d}:{t.minute:02d}"
+
+
+def _fmt_dt_minutes(dt: datetime, off_min: int) -> str:
+    """ISO-8601 to minute precision (same shape as isoformat(timespec="minutes"))."""
+    sign = "+" if off_min >= 0 else "-"
+    a = abs(off_min)
+    return (
+        f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}"
+        f"T{dt.hour:02d}:{dt.minute:02d}{sign}{a // 60:02d}:{a % 60:02d}"
+    )
+
+
 def _parse_time_arg(v: str | None) -> tuple[int, int, str]:
     """
     If v is None -> system time.
@@ -222,32 +296,38 @@ def _parse_time_arg(v: str | None) -> tuple[int, int, str]:
     Returns: (timestamp, tz_offset_minutes, display_string)
     """
     if not v or v == "__SYSTEM__":
-        dt = datetime.now().astimezone()
+        dt = datetime.now(_LOCAL_TZ)
         ts = int(dt.timestamp())
         off = dt.utcoffset()
         off_min = int(off.total_seconds() // 60) if off else 0
-        return ts, off_min, dt.isoformat(timespec="minutes")
+        return ts, off_min, _fmt_dt_minutes(dt, off_min)
 
+    # Explicit inputs go through astimezone() so the offset is the
+    # DST-correct one for that instant, not the cached offset of "now".
     s = v.strip()
-    if re.fullmatch(r"\d{9,12}", s):
+    if _EPOCH_RE.fullmatch(s):
         ts = int(s)
         dt = datetime.fromtimestamp(ts).astimezone()
         off = dt.utcoffset()
         off_min = int(off.total_seconds() // 60) if off else 0
-        return ts, off_min, dt.isoformat(timespec="minutes")
+        return ts, off_min, _fmt_dt_minutes(dt, off_min)
 
     dt_naive = datetime.strptime(s, "%Y-%m-%d %H:%M")
-    dt = dt_naive.replace(tzinfo=datetime.now().astimezone().tzinfo)
+    dt = dt_naive.astimezone()
     ts = int(dt.timestamp())
     off = dt.utcoffset()
     off_min = int(off.total_seconds() // 60) if off else 0
-    return ts, off_min, dt.isoformat(timespec="minutes")
+    return ts, off_min, _fmt_dt_minutes(dt, off_min)
+
+
+# .raw files above this size are mmap'ed instead of copied into memory
+_MMAP_THRESHOLD = 256 * 1024
 
 
-def _read_pcm(path: Path) -> bytes:
+def _read_pcm(path: Path) -> bytes | bytearray | mmap.mmap:
     """
     Read PCM bytes.
-      - .raw: returned as-is
+      - .raw: returned as-is (mmap'ed zero-copy when large)
       - .wav: validates 8kHz, u8, mono, then returns raw frames
     """
     if path.suffix.lower() == ".wav":
@@ -261,8 +341,45 @@ def _read_pcm(path: Path) -> bytes:
                 raise ValueError(f"WAV must be 8-bit unsigned (sampwidth=1), got {sampw}")
             if rate != 8000:
                 raise ValueError(f"WAV must be 8000 Hz, got {rate}")
-            return w.readframes(w.getnframes())
-    return path.read_bytes()
+
+            # Stream frames into one preallocated buffer instead of
+            # readframes(getnframes()), which builds the whole file twice.
+            total = w.getnframes() * sampw * nch
+            buf = bytearray(total)
+            mv = memoryview(buf)
+            off = 0
+            chunk_frames = 1 << 20  # 1 MiB at 1 byte/frame (u8 mono)
+            while off < total:
+                part = w.readframes(chunk_frames)
+                if not part:
+                    break
+                mv[off:off + len(part)] = part
+                off += len(part)
+            return buf if off == total else buf[:off]
+
+    size = path.stat().st_size
+
+    # Large .raw: a read-only mmap is zero-copy — pages come straight from the
+    # page cache as the upload loop slices through the file.
+    if size > _MMAP_THRESHOLD:
+        fd = os.open(str(path), os.O_RDONLY)
+        try:
+            return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+
+    # Small .raw: read straight into a preallocated buffer (no BufferedReader
+    # copy, no double allocation from read_bytes).
+    buf = bytearray(size)
+    mv = memoryview(buf)
+    off = 0
+    with path.open("rb", buffering=0) as f:
+        while off < size:
+            n = f.readinto(mv[off:])
+            if not n:
+                break
+            off += n
+    return buf if off == size else buf[:off]
 
 
 DAY_ENUM_BY_KEY = {
@@ -276,26 +393,34 @@ DAY_ENUM_BY_KEY = {
 }
 
 
+_WEEKDAY_KEYS = ("mon", "tue", "wed", "thu", "fri")
+_WEEKEND_KEYS = ("sat", "sun")
+
+
+@functools.lru_cache(maxsize=4)
+def _day_enum_table(enum_cls) -> dict[str, Any]:
+    """abbrev -> AlarmDay member, resolved once per enum class."""
+    return {k: getattr(enum_cls, v) for k, v in DAY_ENUM_BY_KEY.items()}
+
+
 def _days_set_from_spec(spec: str, AlarmDayEnum):
     s = spec.strip().lower().replace(" ", "")
     if s in ("once", "0", "none", ""):
         return set()
 
+    tbl = _day_enum_table(AlarmDayEnum)
     if s == "weekdays":
-        keys = ["mon", "tue", "wed", "thu", "fri"]
+        keys = _WEEKDAY_KEYS
     elif s == "weekend":
-        keys = ["sat", "sun"]
+        keys = _WEEKEND_KEYS
     elif s == "all":
-        keys = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+        keys = tuple(tbl)
     else:
         keys = [k for k in s.split(",") if k]
-
-    out = set()
-    for k in keys:
-        if k not in DAY_ENUM_BY_KEY:
+        if set(keys) - tbl.keys():
             raise ValueError("invalid days spec (use once|weekdays|weekend|all|mon,tue,...)")
-        out.add(getattr(AlarmDayEnum, DAY_ENUM_BY_KEY[k]))
-    return out
+
+    return {tbl[k] for k in keys}
 
 
 def _days_pretty(days) -> str:
@@ -314,6 +439,22 @@ def _days_pretty(days) -> str:
     return " ".join(parts)
 
 
+@functools.lru_cache(maxsize=1)
+def _ringtone_reverse_index(ringtones_mod) -> dict[bytes, str]:
+    """signature bytes -> display name, built once per process."""
+    index = {
+        bytes(v): k
+        for k, v in (getattr(ringtones_mod, "RINGTONE_SIGNATURES", {}) or {}).items()
+    }
+    dead = getattr(ringtones_mod, "CUSTOM_SLOT_DEAD", None)
+    beef = getattr(ringtones_mod, "CUSTOM_SLOT_BEEF", None)
+    if dead is not None:
+        index.setdefault(bytes(dead), "custom_dead")
+    if beef is not None:
+        index.setdefault(bytes(beef), "custom_beef")
+    return index
+
+
 def _parse_ringtone_signature(v: str, ringtones_mod) -> bytes:
     """
     Accept:
@@ -325,6 +466,10 @@ def _parse_ringtone_signature(v: str, ringtones_mod) -> bytes:
     if not s:
         raise ValueError("--ringtone requires a value (name/hex/dead/beef)")
 
+    # fast path: raw 8-hex signature (common in scripted use)
+    if len(s) == 8 and _HEX8_RE.fullmatch(s):
+        return bytes.fromhex(s)
+
     sigs = getattr(ringtones_mod, "RINGTONE_SIGNATURES", {}) or {}
     s2 = s.replace("-", "_").replace(" ", "_")
     if s in sigs:
@@ -338,7 +483,7 @@ def _parse_ringtone_signature(v: str, ringtones_mod) -> bytes:
         except Exception:
             pass
 
-    cleaned = re.sub(r"[^0-9a-f]", "", s)
+    cleaned = s.translate(_NONHEX_LOWER_DEL_TBL)
     if len(cleaned) != 8:
         raise ValueError("ringtone must be a known name, 'dead'/'beef', or 8 hex chars (4 bytes)")
     return bytes.fromhex(cleaned)
@@ -346,13 +491,16 @@ def _parse_ringtone_signature(v: str, ringtones_mod) -> bytes:
 
 # -------------------------- BLE wrapper --------------------------
 
-async def _with_device(QingpingCls, mac: str, token_hex: str, reporter: Reporter, fn):
+@asynccontextmanager
+async def _device(QingpingCls, mac: str, token_hex: str, reporter: Reporter):
+    """Connected device as a context manager; callers inline their operation
+    instead of allocating a throwaway closure per action."""
     dev = QingpingCls(mac, token=token_hex)
     ok = await dev.connect()
     if not ok:
         raise RuntimeError(f"failed to connect/authenticate to {mac}")
     try:
-        return await fn(dev)
+        yield dev
     finally:
         try:
             await dev.disconnect()
@@ -374,82 +522,94 @@ async def do_set_time(args, creds: StoredConfig, lib: dict[str, Any], reporter:
 
     Qingping = lib["Qingping"]
 
-    async def _op(dev):
+    async with _device(Qingping, creds.address, creds.token_hex, reporter) as dev:
         await dev.set_time(ts, timezone_offset=tz_to_set)
 
-    await _with_device(Qingping, creds.address, creds.token_hex, reporter, _op)
-
     tz_msg = f"tz={tz_to_set} min" if tz_to_set is not None else "tz=unchanged"
     reporter.info(action, f"{display} ({tz_msg})")
     return 0
 
 
+# (field name, display default) read off the configuration in one pass
+_SETTINGS_FIELDS = (
+    ("language", None),
+    ("use_24h_format", False),
+    ("use_celsius", True),
+    ("sound_volume", "?"),
+    ("timezone_offset", 0),
+    ("screen_light_time", "?"),
+    ("daytime_brightness", "?"),
+    ("nighttime_brightness", "?"),
+    ("night_time_start_time", None),
+    ("night_time_end_time", None),
+    ("night_mode_enabled", None),
+    ("alarms_on", None),
+    ("ringtone_signature_hex", "????????"),
+    ("ringtone_signature", None),
+)
+
+
 async def do_get_settings(args, creds: StoredConfig, lib: dict[str, Any], reporter: Reporter) -> int:
     action = "settings get"
     Qingping = lib["Qingping"]
     ringtones_mod = lib["ringtones"]
 
-    async def _op(dev):
+    async with _device(Qingping, creds.address, creds.token_hex, reporter) as dev:
         await dev.get_configuration()
         cfg = getattr(dev, "configuration", None)
         if not cfg:
             raise RuntimeError("no configuration received")
 
-        # compact, readable
-        lang = getattr(cfg, "language", None)
+        # compact, readable — one attribute pass instead of getattr chains
+        d = {k: getattr(cfg, k, dflt) for k, dflt in _SETTINGS_FIELDS}
+
+        lang = d["language"]
         lang_s = getattr(lang, "value", str(lang)) if lang is not None else "?"
-        tf = "24h" if getattr(cfg, "use_24h_format", False) else "12h"
-        tu = "C" if getattr(cfg, "use_celsius", True) else "F"
-        vol = getattr(cfg, "sound_volume", "?")
-        tz = int(getattr(cfg, "timezone_offset", 0))
-        bl = getattr(cfg, "screen_light_time", "?")
-        db = getattr(cfg, "daytime_brightness", "?")
-        nb = getattr(cfg, "nighttime_brightness", "?")
-        ns = getattr(cfg, "night_time_start_time", None)
-        ne = getattr(cfg, "night_time_end_time", None)
-        nm = getattr(cfg, "night_mode_enabled", None)
-        alarms = getattr(cfg, "alarms_on", None)
-        sig_hex = getattr(cfg, "ringtone_signature_hex", "????????")
+        tf = "24h" if d["use_24h_format"] else "12h"
+        tu = "C" if d["use_celsius"] else "F"
+        vol = d["sound_volume"]
+        tz = int(d["timezone_offset"])
+        bl = d["screen_light_time"]
+        db = d["daytime_brightness"]
+        nb = d["nighttime_brightness"]
+        ns = d["night_time_start_time"]
+        ne = d["night_time_end_time"]
+        nm = d["night_mode_enabled"]
+        alarms = d["alarms_on"]
+        sig_hex = d["ringtone_signature_hex"]
 
         # try resolve ringtone name (best effort)
-        sig_bytes = getattr(cfg, "ringtone_signature", None)
+        sig_bytes = d["ringtone_signature"]
         rt_name = "unknown"
         try:
             if isinstance(sig_bytes, (bytes, bytearray)) and len(sig_bytes) == 4:
-                for k, v in getattr(ringtones_mod, "RINGTONE_SIGNATURES", {}).items():
-                    if bytes(v) == bytes(sig_bytes):
-                        rt_name = k
-                        break
-                if rt_name == "unknown":
-                    if hasattr(ringtones_mod, "CUSTOM_SLOT_DEAD") and bytes(sig_bytes) == bytes(getattr(ringtones_mod, "CUSTOM_SLOT_DEAD")):
-                        rt_name = "custom_dead"
-                    if hasattr(ringtones_mod, "CUSTOM_SLOT_BEEF") and bytes(sig_bytes) == bytes(getattr(ringtones_mod, "CUSTOM_SLOT_BEEF")):
-                        rt_name = "custom_beef"
+                rt_name = _ringtone_reverse_index(ringtones_mod).get(bytes(sig_bytes), "unknown")
         except Exception:
             rt_name = "unknown"
 
-        ns_s = ns.strftime("%H:%M") if ns else "??:??"
-        ne_s = ne.strftime("%H:%M") if ne else "??:??"
+        ns_s = _fmt_hhmm(ns) if ns else "??:??"
+        ne_s = _fmt_hhmm(ne) if ne else "??:??"
         nm_s = "on" if nm else "off"
         alarms_s = "on" if alarms else "off"
 
-        print("Device Settings")
-        print("-" * 60)
-        print(f"Volume           : {vol} (1-5)")
-        print(f"Language         : {lang_s}")
-        print(f"Time format      : {tf}")
-        print(f"Temp unit        : {tu}")
-        print(f"Timezone         : {tz:+d} min")
-        print(f"Backlight        : {bl} s (0=off)")
-        print(f"Brightness day   : {db}")
-        print(f"Brightness night : {nb}")
-        print(f"Night mode       : {nm_s}")
-        print(f"Night start/end  : {ns_s} - {ne_s}")
-        print(f"Master alarms    : {alarms_s}")
-        print(f"Ringtone         : {rt_name} ({sig_hex})")
-        print("-" * 60)
-
-    await _with_device(Qingping, creds.address, creds.token_hex, reporter, _op)
+        sys.stdout.write("\n".join((
+            "Device Settings",
+            "-" * 60,
+            f"Volume           : {vol} (1-5)",
+            f"Language         : {lang_s}",
+            f"Time format      : {tf}",
+            f"Temp unit        : {tu}",
+            f"Timezone         : {tz:+d} min",
+            f"Backlight        : {bl} s (0=off)",
+            f"Brightness day   : {db}",
+            f"Brightness night : {nb}",
+            f"Night mode       : {nm_s}",
+            f"Night start/end  : {ns_s} - {ne_s}",
+            f"Master alarms    : {alarms_s}",
+            f"Ringtone         : {rt_name} ({sig_hex})",
+            "-" * 60,
+        )) + "\n")
+
     reporter.info(action)
     return 0
 
@@ -463,8 +623,9 @@ async def do_set_settings(args, creds: StoredConfig, lib: dict[str, Any], report
     # collect changes (for INFO line)
     changes: list[str] = []
 
-    async def _op(dev):
-        nonlocal changes
+    async with _device(Qingping, creds.address, creds.token_hex, reporter) as dev:
+        # Always read-modify-write: header bytes 3-4 and the reserved byte
+        # cannot be supplied on argv and must be preserved as reported.
         await dev.get_configuration()
         cfg = getattr(dev, "configuration", None)
         if not cfg:
@@ -472,6 +633,11 @@ async def do_set_settings(args, creds: StoredConfig, lib: dict[str, Any], report
 
         changed_any = False
 
+        if args.tz is not None:
+            cfg.timezone_offset = _parse_tz(args.tz)
+            changes.append(f"tz={args.tz}")
+            changed_any = True
+
         if args.volume is not None:
             if not (1 <= args.volume <= 5):
                 raise ValueError("volume must be 1..5")
@@ -480,7 +646,9 @@ async def do_set_settings(args, creds: StoredConfig, lib: dict[str, Any], report
             changed_any = True
 
         if args.lang is not None:
-            cfg.language = Language.EN if args.lang == "en" else Language.ZH
+            # argparse restricts --lang to the enum's values; the value map is
+            # a prebuilt dict, cheaper than Language(args.lang)
+            cfg.language = Language._value2member_map_[args.lang]
             changes.append(f"lang={args.lang}")
             changed_any = True
 
@@ -554,8 +722,6 @@ async def do_set_settings(args, creds: StoredConfig, lib: dict[str, Any], report
 
         await dev.set_configuration(cfg)
 
-    await _with_device(Qingping, creds.address, creds.token_hex, reporter, _op)
-
     reporter.info(action, ", ".join(changes) if changes else None)
     return 0
 
@@ -570,11 +736,9 @@ async def do_preview_brightness(args, creds: StoredConfig, lib: dict[str, Any],
     if val < 0 or val > 100 or val % 10 != 0:
         raise ValueError("brightness must be 0..100 and multiple of 10")
 
-    async def _op(dev):
-        payload = bytes([0x02, 0x03, val // 10])
-        await dev._write_config(payload)
+    async with _device(Qingping, creds.address, creds.token_hex, reporter) as dev:
+        await dev._write_config(bytes([0x02, 0x03, val // 10]))
 
-    await _with_device(Qingping, creds.address, creds.token_hex, reporter, _op)
     reporter.info(action, f"value={val}")
     return 0
 
@@ -592,10 +756,9 @@ async def do_preview_ringtone(args, creds: StoredConfig, lib: dict[str, Any], re
         payload = b"\x01\x04"
         details = None
 
-    async def _op(dev):
+    async with _device(Qingping, creds.address, creds.token_hex, reporter) as dev:
         await dev._write_config(payload)
 
-    await _with_device(Qingping, creds.address, creds.token_hex, reporter, _op)
     reporter.info(action, details)
     return 0
 
@@ -604,15 +767,17 @@ async def do_get_alarms(args, creds: StoredConfig, lib: dict[str, Any], reporter
     action = "alarms get"
     Qingping = lib["Qingping"]
 
-    async def _op(dev):
+    async with _device(Qingping, creds.address, creds.token_hex, reporter) as dev:
         await dev.get_alarms()
         alarms = getattr(dev, "alarms", []) or []
 
-        # print table
-        print("Alarms")
-        print("-" * 78)
-        print(f"{'Slot':>4}  {'State':<5}  {'Time':<5}  {'Repeat':<27}  {'Snooze':<6}")
-        print("-" * 78)
+        # build the table in memory and emit it in one write
+        lines = [
+            "Alarms",
+            "-" * 78,
+            f"{'Slot':>4}  {'State':<5}  {'Time':<5}  {'Repeat':<27}  {'Snooze':<6}",
+            "-" * 78,
+        ]
 
         configured = 0
         enabled = 0
@@ -622,7 +787,7 @@ async def do_get_alarms(args, creds: StoredConfig, lib: dict[str, Any], reporter
             slot = getattr(a, "slot", None)
             if not getattr(a, "is_configured", False):
                 empty += 1
-                print(f"{slot:>4}  {'EMPTY':<5}  {'--:--':<5}  {'-':<27}  {'-':<6}")
+                lines.append(f"{slot:>4}  {'EMPTY':<5}  {'--:--':<5}  {'-':<27}  {'-':<6}")
                 continue
 
             configured += 1
@@ -630,16 +795,16 @@ async def do_get_alarms(args, creds: StoredConfig, lib: dict[str, Any], reporter
             if a.is_enabled:
                 enabled += 1
             t = a.time
-            t_str = t.strftime("%H:%M") if t else "--:--"
+            t_str = _fmt_hhmm(t) if t else "--:--"
             rep = _days_pretty(getattr(a, "days", None))
             snooze = getattr(a, "snooze", None)
             snooze_str = "on" if snooze else "off"
-            print(f"{slot:>4}  {st:<5}  {t_str:<5}  {rep:<27}  {snooze_str:<6}")
+            lines.append(f"{slot:>4}  {st:<5}  {t_str:<5}  {rep:<27}  {snooze_str:<6}")
 
-        print("-" * 78)
-        print(f"Configured: {configured}  Enabled: {enabled}  Empty: {empty}")
+        lines.append("-" * 78)
+        lines.append(f"Configured: {configured}  Enabled: {enabled}  Empty: {empty}")
+        sys.stdout.write("\n".join(lines) + "\n")
 
-    await _with_device(Qingping, creds.address, creds.token_hex, reporter, _op)
     reporter.info(action)
     return 0
 
@@ -670,7 +835,7 @@ async def do_set_alarm(args, creds: StoredConfig, lib: dict[str, Any], reporter:
     snooze_val = _parse_onoff(args.alarm_snooze) if args.alarm_snooze is not None else None
     days_val = _days_set_from_spec(args.alarm_days, AlarmDayEnum) if args.alarm_days else None
 
-    async def _op(dev):
+    async with _device(Qingping, creds.address, creds.token_hex, reporter) as dev:
         ok = await dev.set_alarm(
             slot=slot,
             is_enabled=enable_val,
@@ -681,13 +846,11 @@ async def do_set_alarm(args, creds: StoredConfig, lib: dict[str, Any], reporter:
         if not ok:
             raise RuntimeError("set_alarm returned False")
 
-    await _with_device(Qingping, creds.address, creds.token_hex, reporter, _op)
-
     details = [f"slot={slot}"]
     if enable_val is not None:
         details.append(f"enabled={'on' if enable_val else 'off'}")
     if time_val is not None:
-        details.append(f"time={time_val.strftime('%H:%M')}")
+        details.append(f"time={_fmt_hhmm(time_val)}")
     if days_val is not None:
         details.append(f"days={_days_pretty(days_val)}")
     if snooze_val is not None:
@@ -706,8 +869,15 @@ async def do_delete_alarm(args, creds: StoredConfig, lib: dict[str, Any], report
 
     slot_raw = str(args.alarm_slot).strip().lower()
 
-    async def _op(dev):
-        if slot_raw == "all":
+    single_slot: int | None = None
+    if slot_raw != "all":
+        try:
+            single_slot = int(slot_raw)
+        except Exception:
+            raise ValueError("--alarm-slot must be an integer (e.g. 0) or 'all'")
+
+    async with _device(Qingping, creds.address, creds.token_hex, reporter) as dev:
+        if single_slot is None:
             # Wipe every slot we can see from get_alarms
             await dev.get_alarms()
             alarms = getattr(dev, "alarms", []) or []
@@ -730,6 +900,8 @@ async def do_delete_alarm(args, creds: StoredConfig, lib: dict[str, Any], report
             slots = sorted(set(slots))
 
             failed: list[int] = []
+            # Sequential on purpose: delete_alarm refreshes the shared alarm
+            # snapshot/event after each write, so concurrent calls would race.
             for s in slots:
                 ok = await dev.delete_alarm(s)
                 if not ok:
@@ -739,22 +911,14 @@ async def do_delete_alarm(args, creds: StoredConfig, lib: dict[str, Any], report
                 raise RuntimeError(f"failed to delete alarm slots: {failed}")
 
             reporter.debug(f"deleted slots: {slots}")
-            return ("all", len(slots))
-
-        # single slot
-        try:
-            slot = int(slot_raw)
-        except Exception:
-            raise ValueError("--alarm-slot must be an integer (e.g. 0) or 'all'")
-
-        ok = await dev.delete_alarm(slot)
-        if not ok:
-            raise RuntimeError("delete_alarm returned False")
-
-        return (slot, 1)
+            res = ("all", len(slots))
+        else:
+            ok = await dev.delete_alarm(single_slot)
+            if not ok:
+                raise RuntimeError("delete_alarm returned False")
+            res = (single_slot, 1)
 
-    res = await _with_device(Qingping, creds.address, creds.token_hex, reporter, _op)
-    if isinstance(res, tuple) and res[0] == "all":
+    if res[0] == "all":
         reporter.info(action, f"slot=all (deleted={res[1]})")
     else:
         reporter.info(action, f"slot={res[0]}")
@@ -776,7 +940,7 @@ async def do_upload_ringtone(args, creds: StoredConfig, lib: dict[str, Any], rep
     if slot not in ("auto", "dead", "beef"):
         raise ValueError("--ringtone-slot must be: auto|dead|beef")
 
-    async def _op(dev):
+    async with _device(Qingping, creds.address, creds.token_hex, reporter) as dev:
         # decide target signature
         if slot == "auto":
             await dev.get_configuration()
@@ -789,26 +953,106 @@ async def do_upload_ringtone(args, creds: StoredConfig, lib: dict[str, Any], rep
         reporter.debug(f"target signature: {bytes(sig).hex()}")
 
         last_pct = -1
+        last_t = 0.0
 
         def _progress(p: float):
-            nonlocal last_pct
+            # Throttle to 1% steps and at most one write per 50 ms so the
+            # flush syscalls don't perturb the BLE-bound event loop.
+            nonlocal last_pct, last_t
             pct = int(p * 100)
-            if pct != last_pct:
+            now = time.monotonic()
+            if pct != last_pct and (pct == 100 or now - last_t > 0.05):
                 last_pct = pct
-                print(f"\rUploading: {pct:3d}%", end="", flush=True)
+                last_t = now
+                sys.stdout.write(f"\rUploading: {pct:3d}%")
+                sys.stdout.flush()
 
         ok = await dev.upload_ringtone(pcm, signature=bytes(sig), on_progress=_progress)
         print("\rUploading: 100%")
         if not ok:
             raise RuntimeError("upload_ringtone returned False")
 
-    await _with_device(Qingping, creds.address, creds.token_hex, reporter, _op)
     reporter.info(action, f"file={path.name}, bytes={len(pcm)}, slot={slot}")
     return 0
 
 
+# args attribute -> handler; an action is selected when its value is neither
+# None nor False (store_true flags parse to False, value actions to None)
+_DISPATCH = (
+    ("set_time", do_set_time),
+    ("get_settings", do_get_settings),
+    ("set_settings", do_set_settings),
+    ("preview_brightness", do_preview_brightness),
+    ("preview_ringtone", do_preview_ringtone),
+    ("get_alarms", do_get_alarms),
+    ("set_alarm", do_set_alarm),
+    ("delete_alarm", do_delete_alarm),
+    ("upload_ringtone", do_upload_ringtone),
+)
+
+
 # -------------------------- argparse (NO subcommands) --------------------------
 
+# Static argument specs; build_parser just loops over these.
+
+_OPTION_SPEC = (
+    ("--config", {"default": None, "help": f"Config path (default: {DEFAULT_CONFIG_PATH})"}),
+    ("--debug", {"action": "store_true", "help": "Debug output (more logs + traceback on errors)"}),
+    # Credentials (required unless saved config exists)
+    ("--address", {"default": None, "help": "BLE MAC address (required unless config saved)"}),
+    ("--token", {"default": None, "help": "16-byte token (32 hex chars) (required unless config saved)"}),
+    ("--tz", {"default": None, "help": "Timezone offset for --set-time/--set-settings: +HH:MM / -HH:MM or minutes (multiple of 6)"}),
+    ("--no-tz", {"action": "store_true", "help": "For --set-time: do NOT update timezone offset"}),
+    # settings options (used with --set-settings)
+    ("--volume", {"type": int, "default": None, "help": "Volume 1..5"}),
+    ("--lang", {"choices": ["en", "zh"], "default": None, "help": "Language"}),
+    ("--timefmt", {"choices": ["24", "12"], "default": None, "help": "Time format"}),
+    ("--temp", {"choices": ["c", "f"], "default": None, "help": "Temperature unit"}),
+    ("--master-alarms", {"default": None, "help": 'Master alarms: "on" or "off"'}),
+    ("--backlight", {"type": int, "default": None, "help": "Backlight seconds 0..30 (0=off)"}),
+    ("--day-bright", {"dest": "day_bright", "type": int, "default": None, "help": "Day brightness 0..100 step 10"}),
+    ("--night-bright", {"dest": "night_bright", "type": int, "default": None, "help": "Night brightness 0..100 step 10"}),
+    ("--night-mode", {"default": None, "help": 'Night mode: "on" or "off"'}),
+    ("--night-start", {"default": None, "help": 'Night start time "HH:MM"'}),
+    ("--night-end", {"default": None, "help": 'Night end time "HH:MM"'}),
+    ("--ringtone", {"default": None, "help": "Ringtone: name, 'dead'/'beef', or 8 hex chars (4 bytes)"}),
+    # preview options
+    ("--preview-volume", {"type": int, "default": None, "help": "Used with --preview-ringtone: volume 1..5"}),
+    # alarm params
+    ("--alarm-slot", {"default": None, "help": "Alarm slot index (e.g. 0..15). For --delete-alarm you can also use: all"}),
+    ("--alarm-time", {"default": None, "help": 'Alarm time "HH:MM"'}),
+    ("--alarm-days", {"default": None, "help": "Repeat: once|weekdays|weekend|all|mon,tue,wed,..."}),
+    ("--alarm-snooze", {"default": None, "help": 'Snooze: "on" or "off"'}),
+    # ringtone upload params
+    ("--ringtone-slot", {"default": "auto", "help": "Upload target slot: auto|dead|beef (default: auto)"}),
+)
+
+# One action required (mutually exclusive)
+_ACTION_SPEC = (
+    ("--set-config", {"action": "store_true", "help": "Save --address/--token to config file"}),
+    ("--show-config", {"action": "store_true", "help": "Show current config (token hidden)"}),
+    ("--set-time", {
+        "nargs": "?",
+        "const": "__SYSTEM__",
+        "metavar": "TIME",
+        "help": 'Update device time. If TIME omitted: system time. TIME format: "YYYY-MM-DD HH:MM" or epoch seconds.',
+    }),
+    ("--get-settings", {"action": "store_true", "help": "Read settings"}),
+    ("--set-settings", {"action": "store_true", "help": "Update settings (use options below)"}),
+    ("--preview-brightness", {"type": int, "metavar": "0..100", "help": "Send brightness preview (0..100 step 10)"}),
+    ("--preview-ringtone", {"action": "store_true", "help": "Play ringtone preview"}),
+    ("--get-alarms", {"action": "store_true", "help": "List alarms"}),
+    ("--set-alarm", {"action": "store_true", "help": "Update one alarm slot (use --alarm-* options)"}),
+    ("--delete-alarm", {"action": "store_true", "help": "Delete one alarm slot (use --alarm-slot)"}),
+    ("--upload-ringtone", {"dest": "upload_ringtone", "metavar": "FILE", "help": "Upload custom ringtone (.wav/.raw)"}),
+)
+
+_ALARM_ENABLE_SPEC = (
+    ("--alarm-enable", {"action": "store_true", "help": "Enable alarm"}),
+    ("--alarm-disable", {"action": "store_true", "help": "Disable alarm"}),
+)
+
+@functools.lru_cache(maxsize=1)
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
         prog=Path(sys.argv[0]).name,
@@ -853,75 +1097,77 @@ def build_parser() -> argparse.ArgumentParser:
         ),
     )
 
-    p.add_argument("--config", default=None, help=f"Config path (default: {DEFAULT_CONFIG_PATH})")
-    p.add_argument("--debug", action="store_true", help="Debug output (more logs + traceback on errors)")
-
-    # Credentials (required unless saved config exists)
-    p.add_argument("--address", default=None, help="BLE MAC address (required unless config saved)")
-    p.add_argument("--token", default=None, help="16-byte token (32 hex chars) (required unless config saved)")
+    for flag, kwargs in _OPTION_SPEC:
+        p.add_argument(flag, **kwargs)
 
     # One action required
     actions = p.add_mutually_exclusive_group(required=True)
+    for flag, kwargs in _ACTION_SPEC:
+        actions.add_argument(flag, **kwargs)
 
-    actions.add_argument("--set-config", action="store_true", help="Save --address/--token to config file")
-    actions.add_argument("--show-config", action="store_true", help="Show current config (token hidden)")
-
-    actions.add_argument(
-        "--set-time",
-        nargs="?",
-        const="__SYSTEM__",
-        metavar="TIME",
-        help='Update device time. If TIME omitted: system time. TIME format: "YYYY-MM-DD HH:MM" or epoch seconds.',
-    )
-    p.add_argument("--tz", default=None, help="Timezone offset for --set-time: +HH:MM / -HH:MM or minutes (multiple of 6)")
-    p.add_argument("--no-tz", action="store_true", help="For --set-time: do NOT update timezone offset")
+    en = p.add_mutually_exclusive_group(required=False)
+    for flag, kwargs in _ALARM_ENABLE_SPEC:
+        en.add_argument(flag, **kwargs)
 
-    actions.add_argument("--get-settings", action="store_true", help="Read settings")
-    actions.add_argument("--set-settings", action="store_true", help="Update settings (use options below)")
-    actions.add_argument("--preview-brightness", type=int, metavar="0..100", help="Send brightness preview (0..100 step 10)")
-    actions.add_argument("--preview-ringtone", action="store_true", help="Play ringtone preview")
+    return p
 
-    # settings options (used with --set-settings)
-    p.add_argument("--volume", type=int, default=None, help="Volume 1..5")
-    p.add_argument("--lang", choices=["en", "zh"], default=None, help="Language")
-    p.add_argument("--timefmt", choices=["24", "12"], default=None, help="Time format")
-    p.add_argument("--temp", choices=["c", "f"], default=None, help="Temperature unit")
-    p.add_argument("--master-alarms", default=None, help='Master alarms: "on" or "off"')
-    p.add_argument("--backlight", type=int, default=None, help="Backlight seconds 0..30 (0=off)")
-    p.add_argument("--day-bright", dest="day_bright", type=int, default=None, help="Day brightness 0..100 step 10")
-    p.add_argument("--night-bright", dest="night_bright", type=int, default=None, help="Night brightness 0..100 step 10")
-    p.add_argument("--night-mode", default=None, help='Night mode: "on" or "off"')
-    p.add_argument("--night-start", default=None, help='Night start time "HH:MM"')
-    p.add_argument("--night-end", default=None, help='Night end time "HH:MM"')
-    p.add_argument("--ringtone", default=None, help="Ringtone: name, 'dead'/'beef', or 8 hex chars (4 bytes)")
 
-    # preview options
-    p.add_argument("--preview-volume", type=int, default=None, help="Used with --preview-ringtone: volume 1..5")
+# -------------------------- main --------------------------
 
-    # alarm actions
-    actions.add_argument("--get-alarms", action="store_true", help="List alarms")
-    actions.add_argument("--set-alarm", action="store_true", help="Update one alarm slot (use --alarm-* options)")
-    actions.add_argument("--delete-alarm", action="store_true", help="Delete one alarm slot (use --alarm-slot)")
+def _show_config(reporter: Reporter, config_path: Path) -> int:
+    cfg = _read_config(config_path)
+    if cfg is None:
+        reporter.error("config show", f"not found/invalid at {config_path}")
+        return 2
+    print("Config")
+    print("-" * 60)
+    print(f"path   : {config_path}")
+    print(f"address: {cfg.address}")
+    print(f"token  : {cfg.token_hex[:4]}...{cfg.token_hex[-4:]} (hidden)")
+    print("-" * 60)
+    reporter.info("config show")
+    return 0
 
-    # alarm params
-    p.add_argument("--alarm-slot", default=None, help="Alarm slot index (e.g. 0..15). For --delete-alarm you can also use: all")
-    p.add_argument("--alarm-time", default=None, help='Alarm time "HH:MM"')
-    p.add_argument("--alarm-days", default=None, help="Repeat: once|weekdays|weekend|all|mon,tue,wed,...")
-    p.add_argument("--alarm-snooze", default=None, help='Snooze: "on" or "off"')
-    en = p.add_mutually_exclusive_group(required=False)
-    en.add_argument("--alarm-enable", action="store_true", help="Enable alarm")
-    en.add_argument("--alarm-disable", action="store_true", help="Disable alarm")
 
-    # ringtone upload action
-    actions.add_argument("--upload-ringtone", dest="upload_ringtone", metavar="FILE", help="Upload custom ringtone (.wav/.raw)")
-    p.add_argument("--ringtone-slot", default="auto", help="Upload target slot: auto|dead|beef (default: auto)")
+def _fast_show_config(argv: list[str]) -> int | None:
+    """Handle a plain --show-config invocation without building the (slow)
+    argparse parser. Returns an exit code, or None to fall through to full
+    parsing when any unrecognized option is present."""
+    if "--show-config" not in argv:
+        return None
 
-    return p
+    debug = False
+    config = None
+    i = 0
+    while i < len(argv):
+        a = argv[i]
+        if a == "--show-config":
+            pass
+        elif a == "--debug":
+            debug = True
+        elif a == "--config":
+            i += 1
+            if i >= len(argv):
+                return None
+            config = argv[i]
+        elif a.startswith("--config="):
+            config = a[len("--config="):]
+        else:
+            return None  # let argparse produce the proper error/help
+        i += 1
 
+    reporter = _setup_logging(debug)
+    return _show_config(reporter, _expand_config_path(config))
 
-# -------------------------- main --------------------------
 
 def main(argv: list[str] | None = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+
+    rc = _fast_show_config(argv)
+    if rc is not None:
+        return rc
+
     args = build_parser().parse_args(argv)
     reporter = _setup_logging(args.debug)
     config_path = _expand_config_path(args.config)
@@ -937,50 +1183,19 @@ def main(argv: list[str] | None = None) -> int:
             return 0
 
         if args.show_config:
-            cfg = _read_config(config_path)
-            if cfg is None:
-                reporter.error("config show", f"not found/invalid at {config_path}")
-                return 2
-            print("Config")
-            print("-" * 60)
-            print(f"path   : {config_path}")
-            print(f"address: {cfg.address}")
-            print(f"token  : {cfg.token_hex[:4]}...{cfg.token_hex[-4:]} (hidden)")
-            print("-" * 60)
-            reporter.info("config show")
-            return 0
+            return _show_config(reporter, config_path)
 
         # BLE operations
         creds = _resolve_creds(args, config_path)
         lib = _import_lib()
 
         # dispatch (one action at a time)
-        if args.set_time is not None:
-            return asyncio.run(do_set_time(args, creds, lib, reporter))
-
-        if args.get_settings:
-            return asyncio.run(do_get_settings(args, creds, lib, reporter))
-
-        if args.set_settings:
-            return asyncio.run(do_set_settings(args, creds, lib, reporter))
+        import asyncio
 
-        if args.preview_brightness is not None:
-            return asyncio.run(do_preview_brightness(args, creds, lib, reporter))
-
-        if args.preview_ringtone:
-            return asyncio.run(do_preview_ringtone(args, creds, lib, reporter))
-
-        if args.get_alarms:
-            return asyncio.run(do_get_alarms(args, creds, lib, reporter))
-
-        if args.set_alarm:
-            return asyncio.run(do_set_alarm(args, creds, lib, reporter))
-
-        if args.delete_alarm:
-            return asyncio.run(do_delete_alarm(args, creds, lib, reporter))
-
-        if args.upload_ringtone is not None:
-            return asyncio.run(do_upload_ringtone(args, creds, lib, reporter))
+        for attr, fn in _DISPATCH:
+            v = getattr(args, attr)
+            if v is not None and v is not False:
+                return asyncio.run(fn(args, creds, lib, reporter))
 
         raise RuntimeError("no action selected (argparse should prevent this)")
 
@@ -990,6 +1205,8 @@ def main(argv: list[str] | None = None) -> int:
     except Exception as e:
         reporter.error("main", _err_reason(e))
         if reporter.debug_enabled:
+            import traceback
+
             traceback.print_exc()
         return 2
 
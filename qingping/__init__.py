@@ -33,7 +33,11 @@ from .ringtones import (
     get_custom_slot_signature,
 )
 
-from .util import alarm_days_from_string, updates_configuration
+from .util import (
+    alarm_days_from_string,
+    alarm_days_bitmask_from_string,
+    updates_configuration,
+)
 
 __all__ = [
     # main client
@@ -70,6 +74,7 @@ __all__ = [
 
     # utils
     "alarm_days_from_string",
+    "alarm_days_bitmask_from_string",
     "updates_configuration",
 ]
 
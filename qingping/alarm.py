@@ -1,4 +1,5 @@
 import logging
+import struct
 from enum import Enum
 from datetime import time as dtime
 
@@ -15,17 +16,46 @@ class AlarmDay(Enum):
     SUNDAY = 7
 
 
+# Day <-> bit tables, built once (bit N = AlarmDay with value N+1)
+_BIT_TO_DAY = (
+    AlarmDay.MONDAY,
+    AlarmDay.TUESDAY,
+    AlarmDay.WEDNESDAY,
+    AlarmDay.THURSDAY,
+    AlarmDay.FRIDAY,
+    AlarmDay.SATURDAY,
+    AlarmDay.SUNDAY,
+)
+_DAY_TO_BIT = {day: 1 << (day.value - 1) for day in AlarmDay}
+
+# Short names indexed by AlarmDay.value - 1
+_DAY_ABBREV = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+# Wire sentinel for an unconfigured slot
+_ALARM_EMPTY = b"\xff\xff\xff\xff\xff"
+
+# Write packet: 0x07 0x05 [slot] [enabled] [HH] [MM] [days] [snooze]
+_ALARM_STRUCT = struct.Struct("<8B")
+
+
 class Alarm:
-    is_enabled: bool | None = None
-    hour: int | None = None
-    minute: int | None = None
-    days: set[AlarmDay] | None = None
-    snooze: bool | None = None
+    __slots__ = ("slot", "is_enabled", "hour", "minute", "days", "snooze")
+
+    is_enabled: bool | None
+    hour: int | None
+    minute: int | None
+    days: set[AlarmDay] | None
+    snooze: bool | None
 
     def __init__(self, slot: int, alarm_bytes: bytes):
         self.slot = slot
+        self.is_enabled = None
+        self.hour = None
+        self.minute = None
+        self.days = None
+        self.snooze = None
 
-        if alarm_bytes == bytes.fromhex("ffffffffff"):
+        if alarm_bytes == _ALARM_EMPTY:
             return
 
         self.is_enabled = alarm_bytes[0] == 1
@@ -36,13 +66,30 @@ class Alarm:
 
         _LOGGER.debug(f"Alarm #{self.slot} enabled: {self.is_enabled}, hour: {self.hour}, minute: {self.minute}, days: {self.days}, snooze: {self.snooze}")
 
+    @classmethod
+    def from_raw(cls, slot: int, enabled: int, hour: int, minute: int, days_bitmask: int, snooze: int) -> "Alarm":
+        """Build from an already-unpacked wire entry without re-slicing bytes."""
+        self = cls.__new__(cls)
+        self.slot = slot
+
+        if enabled == hour == minute == days_bitmask == snooze == 0xFF:
+            self.is_enabled = None
+            self.hour = None
+            self.minute = None
+            self.days = None
+            self.snooze = None
+            return self
+
+        self.is_enabled = enabled == 1
+        self.hour = hour
+        self.minute = minute
+        self.days = [_BIT_TO_DAY[i] for i in range(7) if days_bitmask >> i & 1]
+        self.snooze = snooze == 1
+        return self
+
     @property
     def is_configured(self):
-        return self.is_enabled is not None and \
-            self.hour is not None and \
-            self.minute is not None and \
-            self.days is not None and \
-            self.snooze is not None
+        return None not in (self.is_enabled, self.hour, self.minute, self.days, self.snooze)
 
     @property
     def time(self):
@@ -56,34 +103,27 @@ class Alarm:
 
     @property
     def days_string(self):
-        abbreviation_map = {
-            AlarmDay.MONDAY: "mon",
-            AlarmDay.TUESDAY: "tue",
-            AlarmDay.WEDNESDAY: "wed",
-            AlarmDay.THURSDAY: "thu",
-            AlarmDay.FRIDAY: "fri",
-            AlarmDay.SATURDAY: "sat",
-            AlarmDay.SUNDAY: "sun",
-        }
         if not self.days:
             return ""
-        abbreviations = [abbreviation_map[day] for day in self.days if day in abbreviation_map]
-        return ",".join(abbreviations)
+        # sort for deterministic output (self.days iteration order is not)
+        return ",".join(
+            _DAY_ABBREV[day.value - 1]
+            for day in sorted(self.days, key=lambda d: d.value)
+        )
 
     def to_bytes(self) -> bytes:
-        byte_array = [0x07, 0x05]
-        byte_array.append(self.slot)
-
         if self.is_configured:
-            byte_array.append(0x01 if self.is_enabled else 0x00)
-            byte_array.append(self.hour)
-            byte_array.append(self.minute)
-            byte_array.append(self._days_to_bitmask(self.days))
-            byte_array.append(0x01 if self.snooze else 0x00)
-        else:
-            byte_array.extend([0xff, 0xff, 0xff, 0xff, 0xff])
-
-        return bytes(byte_array)
+            return _ALARM_STRUCT.pack(
+                0x07, 0x05,
+                self.slot,
+                0x01 if self.is_enabled else 0x00,
+                self.hour,
+                self.minute,
+                self._days_to_bitmask(self.days),
+                0x01 if self.snooze else 0x00,
+            )
+
+        return _ALARM_STRUCT.pack(0x07, 0x05, self.slot, 0xff, 0xff, 0xff, 0xff, 0xff)
 
     def deactivate(self):
         self.is_enabled = None
@@ -93,36 +133,11 @@ class Alarm:
         self.snooze = None
 
     def _bitmask_to_days(self, bitmask: int):
-        bit_to_day = {
-            1 << 0: AlarmDay.MONDAY,
-            1 << 1: AlarmDay.TUESDAY,
-            1 << 2: AlarmDay.WEDNESDAY,
-            1 << 3: AlarmDay.THURSDAY,
-            1 << 4: AlarmDay.FRIDAY,
-            1 << 5: AlarmDay.SATURDAY,
-            1 << 6: AlarmDay.SUNDAY
-        }
-
-        days: list[AlarmDay] = []
-        for bit, day in bit_to_day.items():
-            if bitmask & bit:
-                days.append(day)
-
-        return days
+        return [_BIT_TO_DAY[i] for i in range(7) if bitmask >> i & 1]
 
     def _days_to_bitmask(self, days: set[AlarmDay]):
-        day_to_bit = {
-            AlarmDay.MONDAY: 1 << 0,
-            AlarmDay.TUESDAY: 1 << 1,
-            AlarmDay.WEDNESDAY: 1 << 2,
-            AlarmDay.THURSDAY: 1 << 3,
-            AlarmDay.FRIDAY: 1 << 4,
-            AlarmDay.SATURDAY: 1 << 5,
-            AlarmDay.SUNDAY: 1 << 6
-        }
-
         bitmask = 0
         for day in days:
-            bitmask |= day_to_bit[day]
+            bitmask |= _DAY_TO_BIT[day]
 
         return bitmask
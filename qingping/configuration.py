@@ -1,7 +1,41 @@
+import struct
 from datetime import time, datetime, timedelta
 from enum import Enum
+from time import monotonic
 
 CONFIGURATION_VALIDITY_TIME = timedelta(minutes=30)
+_VALIDITY_SECONDS = CONFIGURATION_VALIDITY_TIME.total_seconds()
+
+# Bytes 2..15 of the payload in one unpack (the two leading header bytes are
+# skipped; the 4-byte ringtone signature is sliced separately)
+_CFG_STRUCT = struct.Struct("<xxBBBBBBBBBBBBBB")
+
+# Full 16-byte prefix of a write packet (header included); signature appended
+_CFG_WRITE_STRUCT = struct.Struct("<16B")
+
+# Brightness is packed as nibbles (value // 10); the domain is tiny, so both
+# directions are precomputed tables
+# Deletion table stripping everything that is not a hex digit
+_NONHEX_TRANS = str.maketrans(
+    "", "", "".join(chr(c) for c in range(256) if chr(c) not in "0123456789abcdefABCDEF")
+)
+
+# Flag byte masks; a set bit selects the non-default option
+_FLAG_LANG_EN = 0x01
+_FLAG_12H_FORMAT = 0x02
+_FLAG_FAHRENHEIT = 0x04
+_FLAG_ALARMS_OFF = 0x10
+
+# Night window presets (start hour, start minute, end hour, end minute)
+_NIGHT_ON = (21, 0, 6, 0)
+_NIGHT_OFF = (0, 0, 0, 1)
+
+_NIBBLE_TO_BRIGHTNESS = tuple(((v >> 4) * 10, (v & 0x0F) * 10) for v in range(256))
+_BRIGHTNESS_TO_BYTE = {
+    (day, night): ((day // 10) << 4) | (night // 10)
+    for day in range(0, 101, 10)
+    for night in range(0, 101, 10)
+}
 
 
 class Language(Enum):
@@ -27,42 +61,75 @@ class Configuration:
       15  : reserved (preserve)
       16-19: ringtone signature (4 bytes)
     """
+
+    __slots__ = (
+        "date",
+        "_created_mono",
+        "_sound_volume",
+        "_hdr1",
+        "_hdr2",
+        "_timezone_offset",
+        "_screen_light_time",
+        "_daytime_brightness",
+        "_nighttime_brightness",
+        "_night_time_start_hour",
+        "_night_time_start_minute",
+        "_night_time_end_hour",
+        "_night_time_end_minute",
+        "_tz_plus_flag",
+        "_night_mode",
+        "_reserved",
+        "_ringtone_signature",
+        "_language",
+        "_use_24h_format",
+        "_use_celsius",
+        "_alarms_on",
+    )
+
     def __init__(self, config_bytes: bytes | bytearray):
+        # kept for callers that inspect it; expiry itself uses the monotonic clock
         self.date = datetime.now()
+        self._created_mono = monotonic()
 
         b = bytes(config_bytes)
         if len(b) < 20:
             raise ValueError(f"Configuration payload must be 20 bytes, got {len(b)}")
 
-        self._sound_volume = b[2]
-        self._hdr1 = b[3]
-        self._hdr2 = b[4]
+        (
+            self._sound_volume,
+            self._hdr1,
+            self._hdr2,
+            flags,
+            tz_units,
+            self._screen_light_time,
+            brightness_byte,
+            self._night_time_start_hour,
+            self._night_time_start_minute,
+            self._night_time_end_hour,
+            self._night_time_end_minute,
+            tz_plus,
+            night_mode,
+            self._reserved,
+        ) = _CFG_STRUCT.unpack_from(b)
 
         # stored as absolute minutes; sign in _tz_plus_flag
-        self._timezone_offset = b[6] * 6
-        self._screen_light_time = b[7]
+        self._timezone_offset = tz_units * 6
 
-        brightness = self._byte_to_brightness(b[8])
+        brightness = self._byte_to_brightness(brightness_byte)
         self._daytime_brightness, self._nighttime_brightness = brightness
 
-        self._night_time_start_hour = b[9]
-        self._night_time_start_minute = b[10]
-        self._night_time_end_hour = b[11]
-        self._night_time_end_minute = b[12]
-        self._tz_plus_flag = b[13] == 1
-        self._night_mode = b[14] == 1
-        self._reserved = b[15]
+        self._tz_plus_flag = tz_plus == 1
+        self._night_mode = night_mode == 1
         self._ringtone_signature = b[16:20]
-
-        flags = b[5]
-        self._language = Language.ZH if flags & (1 << 0) == 0 else Language.EN
-        self._use_24h_format = flags & (1 << 1) == 0
-        self._use_celsius = flags & (1 << 2) == 0
-        self._alarms_on = flags & (1 << 4) == 0
+        self._language = Language.EN if flags & _FLAG_LANG_EN else Language.ZH
+        self._use_24h_format = not flags & _FLAG_12H_FORMAT
+        self._use_celsius = not flags & _FLAG_FAHRENHEIT
+        self._alarms_on = not flags & _FLAG_ALARMS_OFF
 
     @property
     def is_expired(self):
-        return self.date + CONFIGURATION_VALIDITY_TIME < datetime.now()
+        # monotonic is immune to wall-clock jumps (NTP, DST, manual set)
+        return monotonic() - self._created_mono > _VALIDITY_SECONDS
 
     @property
     def sound_volume(self):
@@ -86,7 +153,7 @@ class Configuration:
     @ringtone_signature.setter
     def ringtone_signature(self, value: bytes | bytearray | str):
         if isinstance(value, str):
-            cleaned = re.sub(r"[^0-9a-fA-F]", "", value)
+            cleaned = value.translate(_NONHEX_TRANS)
             if len(cleaned) != 8:
                 raise ValueError("Ringtone signature must be 4 bytes = 8 hex chars")
             value = bytes.fromhex(cleaned)
@@ -237,46 +304,42 @@ class Configuration:
     @night_mode_enabled.setter
     def night_mode_enabled(self, value):
         self._night_mode = value
-        if value:
-            self._night_time_start_hour = 21
-            self._night_time_start_minute = 0
-            self._night_time_end_hour = 6
-            self._night_time_end_minute = 0
-        else:
-            self._night_time_start_hour = 0
-            self._night_time_start_minute = 0
-            self._night_time_end_hour = 0
-            self._night_time_end_minute = 1
+        (
+            self._night_time_start_hour,
+            self._night_time_start_minute,
+            self._night_time_end_hour,
+            self._night_time_end_minute,
+        ) = _NIGHT_ON if value else _NIGHT_OFF
 
     def to_bytes(self):
-        byte_array = [0x13, 0x01]
-        byte_array.append(self.sound_volume)
-        byte_array.extend([self._hdr1, self._hdr2])
-
-        config_byte = 0
-        config_byte |= 0 if self.language == Language.ZH else (1 << 0)
-        config_byte |= 0 if self.use_24h_format else (1 << 1)
-        config_byte |= 0 if self.use_celsius else (1 << 2)
-        config_byte |= 0 if self.alarms_on else (1 << 4)
-        byte_array.append(config_byte)
-
-        byte_array.append(self.timezone_offset // 6)
-        byte_array.append(self.screen_light_time)
-        byte_array.append(
-            self._brightness_to_byte(self.daytime_brightness, self.nighttime_brightness)
+        config_byte = (
+            (_FLAG_LANG_EN if self._language == Language.EN else 0)
+            | (0 if self._use_24h_format else _FLAG_12H_FORMAT)
+            | (0 if self._use_celsius else _FLAG_FAHRENHEIT)
+            | (0 if self._alarms_on else _FLAG_ALARMS_OFF)
         )
 
-        byte_array.append(self.night_time_start_hour)
-        byte_array.append(self.night_time_start_minute)
-
-        byte_array.append(self.night_time_end_hour)
-        byte_array.append(self.night_time_end_minute)
-        byte_array.append(0x01 if self._tz_plus_flag else 0x00)
-        byte_array.append(0x01 if self._night_mode else 0x00)
+        brightness_byte = self._brightness_to_byte(
+            self.daytime_brightness, self.nighttime_brightness
+        )
 
-        byte_array.append(self._reserved)
-        byte_array.append(self._ringtone_signature)
-        bytes_result = b''.join([bytes([x]) if isinstance(x, int) else x for x in byte_array])
+        bytes_result = _CFG_WRITE_STRUCT.pack(
+            0x13, 0x01,
+            self.sound_volume,
+            self._hdr1, self._hdr2,
+            config_byte,
+            # magnitude only: the sign travels in the tz-plus flag byte
+            self._timezone_offset // 6,
+            self.screen_light_time,
+            brightness_byte,
+            self.night_time_start_hour,
+            self.night_time_start_minute,
+            self.night_time_end_hour,
+            self.night_time_end_minute,
+            0x01 if self._tz_plus_flag else 0x00,
+            0x01 if self._night_mode else 0x00,
+            self._reserved,
+        ) + self._ringtone_signature
 
         if len(bytes_result) != 20:
             raise ValueError("Configuration bytes must be 20 bytes long.")
@@ -284,24 +347,12 @@ class Configuration:
         return bytes_result
 
     def _byte_to_brightness(self, int_value):
-        first_nibble = (int_value >> 4) & 0x0F
-        second_nibble = int_value & 0x0F
-
-        daytime_brightness = first_nibble * 10
-        nighttime_brightness = second_nibble * 10
-
-        return (daytime_brightness, nighttime_brightness)
+        return _NIBBLE_TO_BRIGHTNESS[int_value]
 
     def _brightness_to_byte(self, daytime_brightness, nighttime_brightness):
-        if not 0 <= daytime_brightness <= 100 or daytime_brightness % 10 != 0:
-            raise ValueError("Daytime brightness must be between 0 and 100 and a multiple of 10.")
-        if not 0 <= nighttime_brightness <= 100 or nighttime_brightness % 10 != 0:
+        try:
+            return _BRIGHTNESS_TO_BYTE[(daytime_brightness, nighttime_brightness)]
+        except KeyError:
+            if not 0 <= daytime_brightness <= 100 or daytime_brightness % 10 != 0:
+                raise ValueError("Daytime brightness must be between 0 and 100 and a multiple of 10.")
             raise ValueError("Nighttime brightness must be between 0 and 100 and a multiple of 10.")
-
-        first_nibble = daytime_brightness // 10
-        second_nibble = nighttime_brightness // 10
-
-        combined_byte_value = (first_nibble << 4) | second_nibble
-        combined_byte = combined_byte_value.to_bytes(1, byteorder='big')
-
-        return combined_byte
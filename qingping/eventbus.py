@@ -5,10 +5,7 @@ class EventBus:
     self.listeners = {}
 
   def add_listener(self, event_name, listener):
-    if not self.listeners.get(event_name, None):
-      self.listeners[event_name] = {listener}
-    else:
-      self.listeners[event_name].add(listener)
+    self.listeners.setdefault(event_name, set()).add(listener)
 
   def remove_listener(self, event_name, listener):
     self.listeners[event_name].remove(listener)
@@ -16,6 +13,10 @@ class EventBus:
       del self.listeners[event_name]
 
   def send(self, event_name, event_data=None):
-    listeners = self.listeners.get(event_name, [])
-    for listener in listeners:
-      asyncio.create_task(listener(event_data))
\ No newline at end of file
+    # Snapshot first: a listener may remove itself while we fan out, and a
+    # single gathered task costs one scheduler dispatch instead of N.
+    listeners = tuple(self.listeners.get(event_name, ()))
+    if not listeners:
+      return
+    asyncio.gather(*(listener(event_data) for listener in listeners),
+                   return_exceptions=True)
@@ -1,7 +1,8 @@
 import asyncio
 import logging
+import struct
 import time
-import re
+from contextlib import asynccontextmanager
 from datetime import time as dtime
 from typing import Callable, Optional, Dict
 from bleak import BleakClient, BleakScanner
@@ -24,6 +25,17 @@ MAIN_CHAR = "00000001-0000-1000-8000-00805f9b34fb"
 CFG_WRITE_CHAR = "0000000B-0000-1000-8000-00805f9b34fb"
 CFG_READ_CHAR = "0000000C-0000-1000-8000-00805f9b34fb"
 
+# Two-byte command header + little-endian u32 (timestamp / audio size)
+_CMD_U32_STRUCT = struct.Struct("<BBI")
+
+# One 5-byte alarm entry from the 0x11 0x06 packet body
+_ALARM_ENTRY_STRUCT = struct.Struct("<BBBBB")
+
+# Deletion table stripping token separators (':', '-', spaces, ...)
+_NON_HEX_DEL = str.maketrans(
+    "", "", "".join(chr(c) for c in range(256) if chr(c) not in "0123456789abcdefABCDEF")
+)
+
 AUTH_PREFIX_1 = bytes.fromhex("1101")
 AUTH_PREFIX_2 = bytes.fromhex("1102")
 
@@ -34,6 +46,9 @@ AUDIO_PACKET_SIZE = 128
 AUDIO_BLOCK_PACKETS = 4
 AUDIO_PAD_BYTE = 0xFF
 
+# Full packet of padding; tails slice from it instead of allocating
+_PAD_FULL = bytes([AUDIO_PAD_BYTE]) * AUDIO_PACKET_SIZE
+
 # Standalone defaults (used to come from Home Assistant integration const.py)
 ALARM_SLOTS_COUNT = 16
 DISCONNECT_DELAY = 5.0
@@ -52,6 +67,9 @@ class Qingping:
         self.token = self._normalize_token(token)
 
         self.client: BleakClient | None = None
+        # Mirrors client.is_connected; kept in sync by connect()/disconnect()
+        # and the disconnect callback so hot paths skip the property chain.
+        self._is_connected = False
         self.configuration: Configuration | None = None
         self.alarms: list[Alarm] = []
         self.eventbus = EventBus()
@@ -64,16 +82,23 @@ class Qingping:
         self.ringtone_signature: Optional[bytes] = None
         self._ack_waiters: Dict[int, asyncio.Future] = {}
         self._cfg_notify_started = False
+        self._cfg_write_no_response = False
         self._disconnect_task: asyncio.Task | None = None
-        self._alarms_by_slot: Dict[int, Alarm] = {}
+        self._alarms_slots: list[Alarm | None] = [None] * ALARM_SLOTS_COUNT
+        self._batching = False
+        self._pending_config: bytes | None = None
 
     def _arm_ack(self, opcode: int) -> asyncio.Future:
-        """Create/replace waiter BEFORE sending packet (prevents race)."""
+        """Create/replace waiter BEFORE sending packet (prevents race).
+
+        The returned future resolves with the ack status byte; callers
+        await it with asyncio.wait_for and a suitable timeout.
+        """
         loop = asyncio.get_running_loop()
         fut = loop.create_future()
 
-        old = self._ack_waiters.get(opcode)
-        if old and not old.done():
+        old = self._ack_waiters.pop(opcode, None)
+        if old is not None and not old.done():
             old.cancel()
 
         self._ack_waiters[opcode] = fut
@@ -96,14 +121,26 @@ class Qingping:
                 raise ValidationError("Token must be exactly 16 bytes")
             return b
 
-        cleaned = re.sub(r"[^0-9a-fA-F]", "", str(token))
-        if len(cleaned) != 32:
+        s = str(token)
+        try:
+            # Fast path: already-clean hex (fromhex tolerates whitespace)
+            b = bytes.fromhex(s)
+        except ValueError:
+            s = s.translate(_NON_HEX_DEL)
+            if len(s) != 32:
+                raise ValidationError("Token must be 16 bytes = 32 hex chars (e.g. 0e659b...ce6e)")
+            return bytes.fromhex(s)
+        if len(b) != 16:
             raise ValidationError("Token must be 16 bytes = 32 hex chars (e.g. 0e659b...ce6e)")
-        return bytes.fromhex(cleaned)
+        return b
 
     async def connect(self) -> bool:
+        # Double-checked fast path: no lock hop when already connected
+        if self._is_connected:
+            return True
+
         async with self._connect_lock:
-            if self.client and self.client.is_connected:
+            if self._is_connected:
                 return True
 
             device = None
@@ -126,7 +163,28 @@ class Qingping:
                 self.client = None
                 return False
 
-            await asyncio.sleep(2.0)  # give some time for service discovery
+            self._is_connected = True
+
+            # Service discovery is the slow part of every (re)connect; await
+            # it directly instead of sleeping a flat 2 s. Recent Bleak
+            # resolves services inside connect() and get_services() returns
+            # the cached collection immediately on reconnects.
+            get_services = getattr(self.client, "get_services", None)
+            if get_services is not None:
+                try:
+                    await get_services()
+                except Exception as e:
+                    _LOGGER.debug("Service discovery wait failed for %s: %s", self.mac, e)
+            else:
+                # Bleak builds without get_services(): poll the services
+                # collection with short yields, bounded by a deadline, and
+                # proceed to auth as soon as it is populated.
+                deadline = time.monotonic() + 3.0
+                while not self.client.services:
+                    if time.monotonic() > deadline:
+                        _LOGGER.debug("Service discovery timeout for %s", self.mac)
+                        break
+                    await asyncio.sleep(0.05)
 
             _LOGGER.debug("Connected to %s, authenticating...", self.mac)
 
@@ -142,6 +200,16 @@ class Qingping:
 
             self._cfg_notify_started = True
 
+            # Probe once whether the config characteristic accepts GATT
+            # Write Without Response; the upload loop uses it when available.
+            try:
+                char = self.client.services.get_characteristic(CFG_WRITE_CHAR)
+                self._cfg_write_no_response = bool(
+                    char and "write-without-response" in char.properties
+                )
+            except Exception:
+                self._cfg_write_no_response = False
+
             return True
 
     async def connect_if_needed(self) -> bool:
@@ -150,14 +218,15 @@ class Qingping:
         return False
 
     async def disconnect(self) -> bool:
-        if self.client and self.client.is_connected:
+        if self._is_connected and self.client:
+            self._is_connected = False
             _LOGGER.debug("Disconnecting from %s...", self.mac)
             await self.client.disconnect()
             return True
         return False
 
     async def delayed_disconnect(self):
-        if not self.client or not self.client.is_connected:
+        if not self._is_connected:
             return
 
         try:
@@ -171,10 +240,11 @@ class Qingping:
             _LOGGER.debug("Failed to disconnect. Error: %s", e)
 
     async def get_configuration(self):
-        if self.client and self.client.is_connected:
+        if self._is_connected:
             self._configuration_event.clear()
             await self._write_config(b"\x01\x02")
-            await asyncio.wait_for(self._configuration_event.wait(), timeout=RESPONSE_TIMEOUT)
+            async with asyncio.timeout(RESPONSE_TIMEOUT):
+                await self._configuration_event.wait()
         else:
             raise NotConnectedError("Not connected")
 
@@ -199,12 +269,13 @@ class Qingping:
             await self.set_configuration(self.configuration)
 
     async def get_alarms(self):
-        if self.client and self.client.is_connected:
+        if self._is_connected:
             self._alarms_event.clear()
             self.alarms = []
-            self._alarms_by_slot.clear()
+            self._alarms_slots = [None] * ALARM_SLOTS_COUNT
             await self._write_config(b"\x01\x06")
-            await asyncio.wait_for(self._alarms_event.wait(), timeout=RESPONSE_TIMEOUT)
+            async with asyncio.timeout(RESPONSE_TIMEOUT):
+                await self._alarms_event.wait()
         else:
             raise NotConnectedError("Not connected")
 
@@ -252,6 +323,37 @@ class Qingping:
 
         return False
 
+    @asynccontextmanager
+    async def batch(self):
+        """Coalesce several configuration setters into one write + one refresh.
+
+        Inside the block, setters only mutate the local configuration; the
+        merged state is written and re-read once on exit::
+
+            async with device.batch():
+                await device.set_sound_volume(3)
+                await device.set_night_mode(True)
+        """
+        await self._ensure_ready()
+
+        self._batching = True
+        try:
+            yield self
+        except BaseException:
+            self._batching = False
+            if self._pending_config is not None:
+                # Discard the failed batch's local mutations; the next read
+                # pulls a clean configuration from the device.
+                self._pending_config = None
+                self.configuration = None
+            raise
+        self._batching = False
+
+        if self._pending_config is not None:
+            self._pending_config = None
+            await self._write_config(self.configuration.to_bytes())
+            await self.get_configuration()
+
     @updates_configuration
     async def enable_alarms(self, is_enabled: bool):
         if not self.configuration:
@@ -259,18 +361,6 @@ class Qingping:
         self.configuration.alarms_on = is_enabled
         await self._write_config(self.configuration.to_bytes())
 
-    async def _wait_for_ack(self, cmd_id: int, timeout: float = RESPONSE_TIMEOUT) -> int:
-        """Wait for a 0x04ff ACK for given command id (0x10 init, 0x08 data block)."""
-        loop = asyncio.get_running_loop()
-        fut: asyncio.Future = loop.create_future()
-
-        prev = self._ack_waiters.pop(cmd_id, None)
-        if prev is not None and not prev.done():
-            prev.cancel()
-
-        self._ack_waiters[cmd_id] = fut
-        return await asyncio.wait_for(fut, timeout=timeout)
-
     async def upload_ringtone(self, pcm_data: bytes, signature: bytes, on_progress=None) -> bool:
         await self._ensure_connected()
 
@@ -278,22 +368,20 @@ class Qingping:
             self._disconnect_task.cancel()
             self._disconnect_task = None
 
-        if self.client and self.client.is_connected and not self._cfg_notify_started:
+        if self._is_connected and not self._cfg_notify_started:
             await self.client.start_notify(CFG_READ_CHAR, self._notification_handler)
             self._cfg_notify_started = True
-            await asyncio.sleep(0.3)
+            # start_notify resolves once the CCCD write completes, so the
+            # subscription is already live; yield once instead of sleeping.
+            # The init ack below would time out if it were not.
+            await asyncio.sleep(0)
 
         if len(signature) != 4:
             raise ValidationError("Ringtone signature must be 4 bytes")
 
         size = len(pcm_data)
-        init_payload = bytes([
-            0x08, 0x10,
-            (size >> 0) & 0xFF,
-            (size >> 8) & 0xFF,
-            (size >> 16) & 0xFF,
-            signature[0], signature[1], signature[2], signature[3],
-        ])
+        # Header + 3-byte LE size + 4-byte signature (drop the u32's top byte)
+        init_payload = _CMD_U32_STRUCT.pack(0x08, 0x10, size & 0xFFFFFFFF)[:5] + bytes(signature)
 
         _LOGGER.info("Sending Init: %s", init_payload.hex())
 
@@ -303,28 +391,34 @@ class Qingping:
 
         await asyncio.wait_for(init_fut, timeout=2.0)
 
-        packet_size = 128
-        packets_per_block = 4
+        packet_size = AUDIO_PACKET_SIZE
+        packets_per_block = AUDIO_BLOCK_PACKETS
         block_size = packet_size * packets_per_block
 
-        sent = 0
         total_blocks = (size + block_size - 1) // block_size
+        total_packets = total_blocks * packets_per_block
+        frame_size = len(AUDIO_DATA_PREFIX) + packet_size
+
+        # Frame every packet into one contiguous buffer up front: prefix, PCM
+        # slice and 0xFF padding are copied exactly once, so the send loop
+        # below only hands out memoryview slices with no per-packet allocation.
+        frames = bytearray(total_packets * frame_size)
+        for idx in range(total_packets):
+            base = idx * frame_size
+            frames[base:base + 2] = AUDIO_DATA_PREFIX
+            chunk = pcm_data[idx * packet_size:(idx + 1) * packet_size]
+            frames[base + 2:base + 2 + len(chunk)] = chunk
+            if len(chunk) < packet_size:
+                frames[base + 2 + len(chunk):base + frame_size] = _PAD_FULL[: packet_size - len(chunk)]
+        view = memoryview(frames)
 
+        sent = 0
         for block_num in range(total_blocks):
             for pkt_idx in range(packets_per_block):
-                pkt_off = block_num * block_size + pkt_idx * packet_size
-
-                if pkt_off >= size:
-                    audio_len = 0
-                    chunk = bytes([AUDIO_PAD_BYTE]) * packet_size
-                else:
-                    remaining = size - pkt_off
-                    audio_len = min(packet_size, remaining)
-                    chunk = pcm_data[pkt_off:pkt_off + audio_len]
-                    if len(chunk) < packet_size:
-                        chunk = chunk + bytes([AUDIO_PAD_BYTE]) * (packet_size - len(chunk))
-
-                packet = AUDIO_DATA_PREFIX + chunk
+                idx = block_num * packets_per_block + pkt_idx
+                pkt_off = idx * packet_size
+                audio_len = min(packet_size, size - pkt_off) if pkt_off < size else 0
+                packet = view[idx * frame_size:(idx + 1) * frame_size]
 
                 is_last_in_block = (pkt_idx == packets_per_block - 1)
 
@@ -332,7 +426,14 @@ class Qingping:
                     blk_fut = self._arm_ack(0x08)
                     await self.client.write_gatt_char(CFG_WRITE_CHAR, packet, response=True)
 
-                    await asyncio.sleep(DISCONNECT_DELAY)
+                    # Ack-bounded, not sleep-bounded: continue as soon as the
+                    # device confirms the block instead of a fixed 5 s wait.
+                    await asyncio.wait_for(blk_fut, timeout=RESPONSE_TIMEOUT)
+                elif self._cfg_write_no_response:
+                    # Intra-block packets need no ATT round-trip: only block
+                    # boundaries are acked, and the LE stack applies its own
+                    # backpressure on queued unacknowledged writes.
+                    await self.client.write_gatt_char(CFG_WRITE_CHAR, packet, response=False)
                 else:
                     await self.client.write_gatt_char(CFG_WRITE_CHAR, packet, response=True)
                     await asyncio.sleep(0.02)
@@ -420,18 +521,17 @@ class Qingping:
         await self._write_config(self.configuration.to_bytes())
 
     async def _ensure_connected(self):
-        async def wait_for_connected():
-            while not self.client or not self.client.is_connected:
-                success = await self.connect()
-                if success:
-                    _LOGGER.info("Successfully connected to the Bluetooth device.")
-                    return
-                _LOGGER.error("Failed to connect. Retrying in %s seconds...", RETRY_INTERVAL)
-                await asyncio.sleep(RETRY_INTERVAL)
-
+        # asyncio.timeout scopes the retry loop with a single scheduled
+        # callback instead of wrapping it in an extra Task via wait_for.
         try:
-            await asyncio.wait_for(wait_for_connected(), timeout=CONNECTION_TIMEOUT)
-        except asyncio.TimeoutError:
+            async with asyncio.timeout(CONNECTION_TIMEOUT):
+                while not self._is_connected:
+                    if await self.connect():
+                        _LOGGER.info("Successfully connected to the Bluetooth device.")
+                        return
+                    _LOGGER.error("Failed to connect. Retrying in %s seconds...", RETRY_INTERVAL)
+                    await asyncio.sleep(RETRY_INTERVAL)
+        except TimeoutError:
             _LOGGER.error("Connection timeout.")
             raise NotConnectedError("Connection timeout")
 
@@ -440,13 +540,31 @@ class Qingping:
             await self._ensure_connected()
             await self.get_configuration()
 
+    async def _ensure_ready(self):
+        """Connected with a fresh configuration — the setter precondition.
+
+        One suspension point when everything is already in place, instead
+        of chaining _ensure_connected and _ensure_configuration.
+        """
+        if not self._is_connected:
+            await self._ensure_connected()
+        if not self.configuration or self.configuration.is_expired:
+            await self.get_configuration()
+
     async def _ensure_alarms(self):
         if not self.alarms or len(self.alarms) < ALARM_SLOTS_COUNT:
             await self._ensure_connected()
             await self.get_alarms()
 
     async def _write_config(self, data: bytes):
-        if self.client and self.client.is_connected:
+        # Batched: only 0x13 config blobs are deferred to the batch flush;
+        # anything else (read requests, alarm frames, previews) goes out
+        # normally so readers inside a batch still get their reply.
+        if self._batching and data and data[0] == 0x13:
+            self._pending_config = bytes(data)
+            return
+
+        if self._is_connected:
             await self._write_gatt_char(CFG_WRITE_CHAR, data)
 
             loop = asyncio.get_running_loop()
@@ -457,47 +575,39 @@ class Qingping:
             raise NotConnectedError("Not connected")
 
     async def _write_gatt_char(self, uuid: str, data: bytes):
-        if self.client and self.client.is_connected:
-            _LOGGER.debug(">> %s: %s", uuid, data.hex())
+        if self._is_connected and self.client:
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(">> %s: %s", uuid, data.hex())
             await self.client.write_gatt_char(uuid, data)
         else:
             raise NotConnectedError("Not connected")
 
     def _get_timestamp_bytes(self, timestamp: int):
-        timestamp_bytes = [0] * 6
-        timestamp_bytes[0] = 0x05
-        timestamp_bytes[1] = 0x09
-        timestamp_bytes[2] = (timestamp >> 0) & 0xFF
-        timestamp_bytes[3] = (timestamp >> 8) & 0xFF
-        timestamp_bytes[4] = (timestamp >> 16) & 0xFF
-        timestamp_bytes[5] = (timestamp >> 24) & 0xFF
-        return bytes(timestamp_bytes)
+        return _CMD_U32_STRUCT.pack(0x05, 0x09, timestamp & 0xFFFFFFFF)
 
     def _notification_handler(self, sender, data):
         """Bleak notification callback (must be sync)."""
         payload = bytes(data)
-        _LOGGER.debug("<< %s", payload.hex())
-
-        if payload.startswith(AUDIO_ACK_PREFIX) and len(payload) >= 3:
-            opcode = payload[2]  # 0x10 init ack, 0x08 block ack
+        # .hex() would otherwise run per packet even with debug logging off
+        debug = _LOGGER.isEnabledFor(logging.DEBUG)
+        if debug:
+            _LOGGER.debug("<< %s", payload.hex())
+
+        # Audio ACK frames: 04 ff [cmd] [status] (0x10 init ack, 0x08 block ack)
+        if len(payload) >= 3 and payload[0] == 0x04 and payload[1] == 0xFF:
+            opcode = payload[2]
+            status = payload[3] if len(payload) >= 4 else 0
             fut = self._ack_waiters.pop(opcode, None)
-            if fut and not fut.done():
-                fut.set_result(payload)
-            _LOGGER.debug("AUDIO ACK opcode=0x%02x payload=%s", opcode, payload.hex())
-            return
-
-        # Audio ACK frames: 04 ff [cmd] [status]
-        if payload.startswith(AUDIO_ACK_PREFIX) and len(payload) >= 4:
-            cmd_id = payload[2]
-            status = payload[3]
-            fut = self._ack_waiters.pop(cmd_id, None)
             if fut is not None and not fut.done():
                 fut.set_result(status)
+            if debug:
+                _LOGGER.debug("AUDIO ACK opcode=0x%02x payload=%s", opcode, payload.hex())
             return
 
         # Configuration packet
         if payload.startswith(b"\x13\x02"):
-            _LOGGER.debug("Got configuration bytes: %s", payload.hex())
+            if debug:
+                _LOGGER.debug("Got configuration bytes: %s", payload.hex())
             self.configuration = Configuration(payload)
             self.ringtone_signature = self.configuration.ringtone_signature
             self._configuration_event.set()
@@ -509,33 +619,35 @@ class Qingping:
         # Each entry: [Enabled] [HH] [MM] [DaysBitmask] [Snooze]
         # Empty slot: FF FF FF FF FF
         if payload.startswith(b"\x11\x06") and len(payload) >= 3 + 5:
-            _LOGGER.debug("Got alarms bytes: %s", payload.hex())
+            if debug:
+                _LOGGER.debug("Got alarms bytes: %s", payload.hex())
             base_index = payload[2]
 
             # New snapshot begins at base 0
             if base_index == 0:
-                self._alarms_by_slot.clear()
+                self._alarms_slots = [None] * ALARM_SLOTS_COUNT
 
             body = payload[3:]
-            entry_count = len(body) // 5
-            for i in range(entry_count):
-                slot = base_index + i
-                if slot < 0 or slot >= ALARM_SLOTS_COUNT:
-                    continue
-                entry = body[i * 5 : (i + 1) * 5]
-                self._alarms_by_slot[slot] = Alarm(slot, entry)
+            alarms_slots = self._alarms_slots
+            slots_count = ALARM_SLOTS_COUNT
+            slot = base_index
+            for fields in _ALARM_ENTRY_STRUCT.iter_unpack(body[: len(body) // 5 * 5]):
+                if 0 <= slot < slots_count:
+                    alarms_slots[slot] = Alarm.from_raw(slot, *fields)
+                slot += 1
 
             # When we have all slots, expose as ordered list and unblock waiters
-            if len(self._alarms_by_slot) >= ALARM_SLOTS_COUNT:
-                self.alarms = [self._alarms_by_slot[i] for i in range(ALARM_SLOTS_COUNT)]
+            if None not in alarms_slots:
+                self.alarms = list(alarms_slots)
                 self._alarms_event.set()
                 self.eventbus.send(ALARMS_UPDATE, self.alarms)
             else:
                 # Partial snapshot - still notify listeners with what we have
-                partial = [self._alarms_by_slot[i] for i in sorted(self._alarms_by_slot)]
+                partial = [a for a in alarms_slots if a is not None]
                 self.eventbus.send(ALARMS_UPDATE, partial)
 
     def _on_disconnect(self, client: BleakClient):
+        self._is_connected = False
         if self._disconnect_task is not None:
             self._disconnect_task.cancel()
             self._disconnect_task = None
@@ -20,6 +20,11 @@ RINGTONE_SIGNATURES: dict[str, bytes] = {
 CUSTOM_SLOT_DEAD = bytes.fromhex("deaddead")  # de ad de ad
 CUSTOM_SLOT_BEEF = bytes.fromhex("beefbeef")  # be ef be ef
 
+# Deletion table stripping everything that is not a lowercase hex digit
+_NON_HEX_DEL = str.maketrans(
+    "", "", "".join(chr(c) for c in range(256) if chr(c) not in "0123456789abcdef")
+)
+
 
 def parse_slot_signature(slot: str) -> bytes:
     """Parse slot argument into a 4-byte signature.
@@ -36,7 +41,7 @@ def parse_slot_signature(slot: str) -> bytes:
         return CUSTOM_SLOT_BEEF
 
     # raw hex
-    s_hex = "".join(ch for ch in s if ch in "0123456789abcdef")
+    s_hex = s.translate(_NON_HEX_DEL)
     if len(s_hex) != 8:
         raise ValueError("slot must be 'dead', 'beef' or 8 hex chars (e.g. deaddead)")
     return bytes.fromhex(s_hex)
@@ -1,34 +1,61 @@
 from functools import wraps
 
-from .alarm import AlarmDay
+from .alarm import AlarmDay, _BIT_TO_DAY
 
+# Day abbreviation -> wire bit (bit N = AlarmDay with value N+1)
+_DAY_BITS = {"mon": 1, "tue": 2, "wed": 4, "thu": 8, "fri": 16, "sat": 32, "sun": 64}
 
-def alarm_days_from_string(days_string: str | None) -> set[AlarmDay] | None:
+_PRESET_MASKS = {
+    "weekdays": 0b0011111,
+    "weekend": 0b1100000,
+    "all": 0b1111111,
+    "once": 0,
+}
+
+
+def alarm_days_bitmask_from_string(days_string: str | None) -> int | None:
+    """Wire-format day bitmask for a preset or comma list, or None if invalid."""
     if not days_string:
         return None
 
-    abbreviation_map = {
-        "mon": AlarmDay.MONDAY,
-        "tue": AlarmDay.TUESDAY,
-        "wed": AlarmDay.WEDNESDAY,
-        "thu": AlarmDay.THURSDAY,
-        "fri": AlarmDay.FRIDAY,
-        "sat": AlarmDay.SATURDAY,
-        "sun": AlarmDay.SUNDAY,
-    }
+    mask = _PRESET_MASKS.get(days_string)
+    if mask is not None:
+        # includes "once" -> 0 (no repeat days)
+        return mask
 
-    abbreviations = days_string.split(",")
-    alarm_days = {abbreviation_map[abbr] for abbr in abbreviations if abbr in abbreviation_map}
-    return alarm_days if alarm_days else None
+    mask = 0
+    for abbr in days_string.split(","):
+        mask |= _DAY_BITS.get(abbr.strip(), 0)
+    return mask if mask else None
+
+
+def alarm_days_from_string(days_string: str | None) -> set[AlarmDay] | None:
+    """Comma-separated day abbreviations to a set of AlarmDay, or None.
+
+    Presets ("weekdays", "weekend", ...) are deliberately not accepted
+    here: None means "keep the existing days" to set_alarm callers, so
+    this keeps its original comma-list-only contract. Use
+    alarm_days_bitmask_from_string for preset-aware parsing.
+    """
+    if not days_string:
+        return None
+
+    mask = 0
+    for abbr in days_string.split(","):
+        mask |= _DAY_BITS.get(abbr, 0)
+    if not mask:
+        return None
+    return {_BIT_TO_DAY[i] for i in range(7) if mask >> i & 1}
 
 
 def updates_configuration(func):
     @wraps(func)
     async def wrapper(self, *args, **kwargs):
-        await self._ensure_connected()
-        await self._ensure_configuration()
+        await self._ensure_ready()
         return_value = await func(self, *args, **kwargs)
-        await self.get_configuration()
+        # Inside Qingping.batch() the refresh is deferred to the batch exit
+        if not getattr(self, "_batching", False):
+            await self.get_configuration()
         return return_value
 
     return wrapper